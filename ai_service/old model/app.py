@@ -1,27 +1,86 @@
 """
 Landmark Recognition Service
-Flask API wrapper for an EfficientNet_B3 Deep Learning model.
+FastAPI wrapper for an EfficientNet_B3 Deep Learning model.
 Handles image fetching, preprocessing, and inference.
 """
 
-from flask import Flask, request, jsonify
+from contextlib import asynccontextmanager, nullcontext
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+import asyncio
+import base64
+import binascii
+import hashlib
+import httpx
+import orjson
+from cachetools import LRUCache
 import torch
 import torch.nn as nn
-import requests
+import torch.nn.functional as F
+import numpy as np
 from PIL import Image
 from io import BytesIO
 from torchvision import transforms, models
+from torchvision.io import decode_jpeg, ImageReadMode
+import torchvision.transforms.functional as TF
 import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
 
-app = Flask(__name__)
+try:
+    import tensorrt as trt
+except ImportError:
+    trt = None
+
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    from safetensors.torch import load_file as load_safetensors
+except ImportError:
+    load_safetensors = None
 
 # --- Configuration & Global Constants ---
 MODEL_FILE = "best_model.pth"
+SAFETENSORS_FILE = "best_model.safetensors" # Optional faster-loading copy of MODEL_FILE
+ENGINE_FILE = "b3.plan" # Optional TensorRT engine built by export_trt.py
+ENGINE_INPUT = "input"  # Input tensor name used by export_trt.py
+INT8_FILE = "b3_int8.pt" # Optional INT8 TorchScript model built by quantize_int8.py (CPU only)
 CLASSES_FILE = "classes.txt"
 NUM_CLASSES = 300 
+INPUT_SHAPE = (1, 3, 300, 300) # Fixed batch-size-1 input for the CUDA graph / TensorRT paths
+MAX_BATCH = 32                 # Max concurrent requests fused into one forward pass
+MAX_WAIT_MS = 5                # How long the batcher waits for more requests to arrive
+# Batch sizes the compiled model is specialized for (powers of two covering MAX_BATCH)
+BATCH_BUCKETS = tuple(1 << i for i in range((MAX_BATCH - 1).bit_length() + 1))
+URL_CACHE_SIZE = 10_000        # Predictions remembered per image URL
+CONTENT_CACHE_SIZE = 50_000    # Predictions remembered per image content hash
+GPU_DECODE_MAX_PIXELS = 4096 * 4096 # Larger JPEGs are decoded by PIL instead of straight into GPU memory
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024 # Request body cap for /predict_raw
+IMAGENET_MEAN = [0.485, 0.456, 0.406] # Standard ImageNet normalization parameters
+IMAGENET_STD = [0.229, 0.224, 0.225]
 
 # Determine the primary compute device (use NVIDIA GPU if available)
 device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+# Half precision + NHWC layout lets cuDNN use Tensor-Core kernels on GPU.
+# CPU kernels are slower in FP16, so the CPU path stays in FP32.
+MODEL_DTYPE = torch.float16 if device.type == 'cuda' else torch.float32
+
+# Input shapes are fixed, so let cuDNN autotune and cache the fastest conv
+# algorithm per shape, and allow TF32 Tensor-Core math for any FP32 work.
+torch.backends.cudnn.benchmark = True
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+torch.set_float32_matmul_precision('high')
+
+# On CPU, an explicit intra-op thread count keeps latency predictable (INT8 in particular)
+if device.type == 'cpu':
+    torch.set_num_threads(min(4, os.cpu_count() or 1))
 
 # 1. Load Class Labels
 # Read the list of landmarks from the text file for mapping indices to names
@@ -34,6 +93,13 @@ try:
 except Exception as e:
     print(f"❌ Error reading classes.txt: {e}")
 
+# Precompute one label per model output so the request path is a plain tuple lookup
+if len(CLASS_NAMES) < NUM_CLASSES:
+    print(f"⚠️ Only {len(CLASS_NAMES)} class names for {NUM_CLASSES} classes, using placeholders.")
+LABELS = tuple(
+    CLASS_NAMES[i] if i < len(CLASS_NAMES) else f"Class {i}" for i in range(NUM_CLASSES)
+)
+
 # 2. Model Architecture Definition
 def get_model(num_classes):
     """
@@ -57,80 +123,574 @@ def get_model(num_classes):
     )
     return model
 
+class SpatialBiasConv(nn.Module):
+    """
+    Convolution followed by a per-position (C_out, H_out, W_out) bias map,
+    so it only accepts inputs of the size the map was computed for.
+    """
+    def __init__(self, conv, bias_map):
+        super().__init__()
+        self.conv = conv
+        self.register_buffer('bias_map', bias_map)
+
+    def forward(self, x):
+        return self.conv(x) + self.bias_map
+
+def fold_normalization(model):
+    """
+    Folds the [0,255] -> [0,1] scaling and ImageNet normalization into the stem
+    convolution, so the network consumes raw pixel values directly:
+    conv(W, (x/255 - mean)/std) == conv(W / (255*std), x) - sum(W * mean / std)
+    The stem's zero padding meant "mean colour" in normalized space, i.e. raw
+    255*mean. That border's contribution is a constant, precomputed once for the
+    fixed input size and added with the bias: the fold is exact, border included.
+    """
+    conv = model.features[0][0]
+    mean = torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1)
+    std = torch.tensor(IMAGENET_STD).view(1, 3, 1, 1)
+    with torch.no_grad():
+        weight = conv.weight / std
+        bias = -(weight * mean).sum(dim=(1, 2, 3))
+        if conv.bias is not None:
+            bias += conv.bias
+        conv.weight.copy_(weight / 255)
+
+        # Padded input = zero-padded raw pixels + a border ring of 255*mean
+        pad_h, pad_w = conv.padding
+        height, width = INPUT_SHAPE[2:]
+        border = (255 * mean).expand(1, 3, height + 2 * pad_h, width + 2 * pad_w).clone()
+        border[:, :, pad_h:pad_h + height, pad_w:pad_w + width] = 0
+        bias_map = F.conv2d(border, conv.weight, None, conv.stride, 0, conv.dilation, conv.groups)
+        bias_map += bias.view(1, -1, 1, 1)
+
+    conv.bias = None # The stem conv has no bias (followed by BatchNorm); it lives in bias_map
+    model.features[0][0] = SpatialBiasConv(conv, bias_map)
+    return model
+
 # 3. Model Initialization
 # We load the model once at startup to ensure fast API responses
+def load_weights():
+    """
+    Loads the trained state dict on CPU without an extra in-memory copy:
+    the checkpoint is memory-mapped, and only tensors are unpickled.
+    """
+    if load_safetensors is not None and os.path.exists(SAFETENSORS_FILE):
+        return load_safetensors(SAFETENSORS_FILE, device='cpu')
+    return torch.load(MODEL_FILE, map_location='cpu', mmap=True, weights_only=True)
+
 model = None
 try:
-    if os.path.exists(MODEL_FILE):
+    if os.path.exists(MODEL_FILE) or os.path.exists(SAFETENSORS_FILE):
         model = get_model(NUM_CLASSES)
-        # Load the trained weights (.pth file)
-        checkpoint = torch.load(MODEL_FILE, map_location=device)
+        # Load the trained weights (.safetensors or .pth file)
+        checkpoint = load_weights()
         model.load_state_dict(checkpoint)
+        # Dropout is a no-op at inference: keep only the Linear layer so the head
+        # is a single Gemm for ONNX/TensorRT and torch.compile
+        model.classifier = model.classifier[1]
+        model = fold_normalization(model)
         model = model.to(device).eval() # Set to evaluation mode (disables dropout)
+        if device.type == 'cuda':
+            model = model.half().to(memory_format=torch.channels_last)
         print(f"✅ EfficientNet_B3 Loaded Successfully (Running on: {device})")
     else:
         print(f"❌ Error: {MODEL_FILE} not found! Model not initialized.")
 except Exception as e:
     print(f"❌ Critical Error loading model: {e}")
 
+# 3b. CUDA Graph Capture
+# At batch size 1 the forward pass is dominated by kernel launch overhead.
+# We record the whole forward once into a CUDA graph over persistent input/output
+# buffers, then each request only copies its pixels in and replays the graph.
+static_in, static_out, cuda_graph = None, None, None
+
+def capture_cuda_graph(net):
+    """
+    Warms up the model on a side stream (initializes cuDNN/cuBLAS kernels) and
+    captures a single forward pass into a CUDA graph.
+    Returns the static input buffer, static output buffer and the graph.
+    """
+    graph_in = torch.zeros(INPUT_SHAPE, device=device, dtype=MODEL_DTYPE)
+    graph_in = graph_in.contiguous(memory_format=torch.channels_last)
+
+    side_stream = torch.cuda.Stream()
+    side_stream.wait_stream(torch.cuda.current_stream())
+    with torch.no_grad(), torch.cuda.stream(side_stream):
+        for _ in range(3):
+            net(graph_in)
+    torch.cuda.current_stream().wait_stream(side_stream)
+
+    graph = torch.cuda.CUDAGraph()
+    with torch.no_grad(), torch.cuda.graph(graph):
+        graph_out = net(graph_in)
+    return graph_in, graph_out, graph
+
+# 3c. TensorRT Engine (optional)
+# If a prebuilt engine is present we run it instead of PyTorch: fused FP16/INT8
+# kernels with no per-layer framework overhead. Persistent torch tensors serve
+# as the engine's device buffers, sized for the largest batch the engine accepts.
+trt_engine, trt_context, trt_in, trt_out = None, None, None, None
+trt_input_name, trt_max_batch = None, 0
+
+def load_trt_engine(path):
+    """
+    Deserializes a TensorRT engine and allocates its input/output buffers.
+    Returns the engine, its execution context, its input tensor name, input buffer,
+    output buffer and the largest batch size it accepts (its optimization profile's max shape).
+    """
+    torch_dtypes = {
+        trt.float32: torch.float32,
+        trt.float16: torch.float16,
+        trt.int8: torch.int8,
+    }
+    runtime = trt.Runtime(trt.Logger(trt.Logger.WARNING))
+    with open(path, 'rb') as f:
+        engine = runtime.deserialize_cuda_engine(f.read())
+    context = engine.create_execution_context()
+
+    names = [engine.get_tensor_name(i) for i in range(engine.num_io_tensors)]
+    input_name = next(n for n in names if engine.get_tensor_mode(n) == trt.TensorIOMode.INPUT)
+    input_shape = tuple(engine.get_tensor_shape(input_name))
+    if input_shape[0] == -1:
+        # Dynamic batch axis: the profile's (min, opt, max) shapes bound it
+        max_batch = min(engine.get_tensor_profile_shape(input_name, 0)[2][0], MAX_BATCH)
+    else:
+        max_batch = input_shape[0]
+
+    buffers = {}
+    for name in names:
+        shape = tuple(max_batch if d == -1 else d for d in engine.get_tensor_shape(name))
+        buf = torch.empty(shape, dtype=torch_dtypes[engine.get_tensor_dtype(name)], device=device)
+        context.set_tensor_address(name, buf.data_ptr())
+        buffers[engine.get_tensor_mode(name)] = buf
+    context.set_input_shape(input_name, input_shape if input_shape[0] != -1 else (1,) + input_shape[1:])
+    return (engine, context, input_name,
+            buffers[trt.TensorIOMode.INPUT], buffers[trt.TensorIOMode.OUTPUT], max_batch)
+
+if trt is not None and device.type == 'cuda' and os.path.exists(ENGINE_FILE):
+    try:
+        trt_engine, trt_context, trt_input_name, trt_in, trt_out, trt_max_batch = load_trt_engine(ENGINE_FILE)
+        print(f"🚀 TensorRT engine loaded from {ENGINE_FILE} (batch size up to {trt_max_batch}).")
+        if trt_max_batch < MAX_BATCH:
+            print("⚠️ Engine has no dynamic batch axis, larger batches use PyTorch. Re-run export_trt.py.")
+    except Exception as e:
+        trt_engine, trt_context, trt_in, trt_out = None, None, None, None
+        trt_input_name, trt_max_batch = None, 0
+        print(f"⚠️ Could not load TensorRT engine, using PyTorch: {e}")
+
+# 3d. torch.compile (preferred PyTorch path)
+# Inductor fuses the pointwise/BN/SiLU ops and "reduce-overhead" replays CUDA
+# graph trees internally, so it supersedes the manual capture above. Where
+# compilation is unavailable (no Triton, older PyTorch) we keep the manual graph.
+compiled_model = None
+
+def prepare_fast_paths():
+    """
+    Compiles the model and warms up every batch bucket, or captures the manual
+    CUDA graph if compilation fails and warms up the eager buckets so cuDNN's
+    benchmark autotuning does not run during live requests. Called from the batch worker thread before it
+    serves traffic: reduce-overhead keeps its CUDA graph state per thread, and
+    doing it there keeps offline scripts that import this module from compiling.
+    """
+    global compiled_model, static_in, static_out, cuda_graph
+    # Only skip when the TensorRT engine already serves every batch size
+    if model is None or device.type != 'cuda' or trt_max_batch >= MAX_BATCH:
+        return
+
+    if hasattr(torch, 'compile'):
+        try:
+            compiled = torch.compile(model, fullgraph=True, dynamic=False, mode="reduce-overhead")
+            # Compilation is lazy: run real-shape forwards for every bucket now so
+            # codegen/autotuning happen before the first request (and failures surface here)
+            warm_up_buckets(compiled)
+            compiled_model = compiled
+            print(f"⚡ torch.compile (reduce-overhead) ready for batch sizes {BATCH_BUCKETS}.")
+            return
+        except Exception as e:
+            print(f"⚠️ torch.compile failed, falling back to CUDA Graph capture: {e}")
+
+    try:
+        static_in, static_out, cuda_graph = capture_cuda_graph(model)
+        print("⚡ CUDA Graph captured for inference.")
+    except Exception as e:
+        # Fall back to the regular eager forward pass
+        static_in, static_out, cuda_graph = None, None, None
+        print(f"⚠️ CUDA Graph capture failed, using eager mode: {e}")
+    warm_up_buckets(model)
+
+def warm_up_buckets(net):
+    """Runs three forwards at every batch bucket size and waits for them to finish."""
+    with torch.no_grad():
+        for bucket in BATCH_BUCKETS:
+            warmup_in = torch.zeros((bucket,) + INPUT_SHAPE[1:], device=device, dtype=MODEL_DTYPE)
+            warmup_in = warmup_in.contiguous(memory_format=torch.channels_last)
+            for _ in range(3):
+                net(warmup_in)
+    torch.cuda.current_stream().synchronize()
+
+# 3e. INT8 Model (CPU deployments)
+# Without a GPU we serve a post-training quantized model (FBGEMM kernels on x86)
+# when quantize_int8.py has produced one.
+int8_model = None
+
+if device.type == 'cpu' and os.path.exists(INT8_FILE):
+    try:
+        int8_model = torch.jit.load(INT8_FILE, map_location='cpu').eval()
+        print(f"✅ INT8 model loaded from {INT8_FILE}.")
+    except Exception as e:
+        int8_model = None
+        print(f"⚠️ Could not load INT8 model, using FP32: {e}")
+
 # 4. Image Preprocessing Pipeline
-# Images must be formatted exactly as they were during training (300x300 pixels)
+# Images must be formatted exactly as they were during training (300x300 pixels).
+# Geometry is done per request; normalization is folded into the model's stem
+# conv, so the batch only needs a uint8 -> float cast on the device.
 transform = transforms.Compose([
     transforms.Resize(345),         # Resize shortest side
     transforms.CenterCrop(300),     # Exact crop for model input
-    transforms.ToTensor(),          # Convert pixels [0,255] to [0.0, 1.0]
-    transforms.Normalize(           # Standard ImageNet normalization parameters
-        [0.485, 0.456, 0.406], 
-        [0.229, 0.224, 0.225]
-    )
 ])
 
-@app.route('/predict', methods=['POST'])
-def predict():
+JPEG_MAGIC = b'\xff\xd8\xff'
+
+# Page-locked staging buffers so host -> device copies can run asynchronously.
+# Two of them: one batch is uploaded while the previous one is still in flight.
+PINNED = None
+if device.type == 'cuda':
+    PINNED = torch.empty((2, MAX_BATCH) + INPUT_SHAPE[1:], dtype=torch.uint8, pin_memory=True)
+
+def preprocess(img_bytes):
+    """
+    Turns raw image bytes into a resized, center-cropped (3, 300, 300) uint8 tensor.
+    JPEGs are decoded on GPU with nvJPEG when available; other formats (PNG, WebP...)
+    and oversized JPEGs go through PIL.
+    """
+    # Opening is lazy (header only) and applies PIL's MAX_IMAGE_PIXELS
+    # decompression-bomb guard to every image, including the nvJPEG path
+    pil_img = Image.open(BytesIO(img_bytes))
+    width, height = pil_img.size
+    if device.type == 'cuda' and img_bytes[:3] == JPEG_MAGIC and width * height <= GPU_DECODE_MAX_PIXELS:
+        try:
+            raw = torch.frombuffer(bytearray(img_bytes), dtype=torch.uint8)
+            img = decode_jpeg(raw, mode=ImageReadMode.RGB, device=device)
+            img = TF.resize(img, 345, antialias=True)
+            img = TF.center_crop(img, 300)
+            # The batch worker reads this on its own streams: wait for the decode here,
+            # in the request's thread, so the worker never has to
+            torch.cuda.current_stream().synchronize()
+            return img
+        except RuntimeError:
+            # Some JPEG variants (e.g. CMYK) are not supported by nvJPEG
+            pass
+    img = transform(pil_img.convert('RGB'))
+    pixels = np.ascontiguousarray(np.asarray(img, dtype=np.uint8))
+    return torch.from_numpy(pixels).permute(2, 0, 1) # HWC -> CHW
+
+def upload_pixels(pixels, buf, slot):
+    """
+    Moves uint8 pixels to the device (through pinned staging buffer `buf`, slot
+    `slot` when they are still on the CPU) and casts them to the model dtype.
+    """
+    if PINNED is not None and pixels.device.type == 'cpu':
+        PINNED[buf, slot].copy_(pixels)
+        pixels = PINNED[buf, slot].to(device, non_blocking=True)
+    elif pixels.is_cuda:
+        # Decoded on another stream: keep its memory from being reused before the cast runs
+        pixels.record_stream(torch.cuda.current_stream())
+    return pixels.to(MODEL_DTYPE)
+
+# 5. Request Batching
+# Request handlers only preprocess; a single worker thread collects concurrent
+# requests into one batch so N in-flight requests cost one forward pass.
+Job = namedtuple('Job', ['tensor', 'future'])
+PENDING = queue.Queue()
+WORKER_READY = threading.Event() # Set once the worker has compiled/captured the model
+
+# Pinned (class index, confidence) rows so a whole batch's results come back
+# in one async device -> host copy and a single sync (double-buffered like PINNED)
+RESULT_PINNED = None
+if device.type == 'cuda':
+    RESULT_PINNED = torch.empty((2, MAX_BATCH, 2), dtype=torch.float32, pin_memory=True)
+
+# Uploads run on COPY_STREAM and the forward pass on COMPUTE_STREAM, so the next
+# batch's host -> device copy overlaps the current batch's inference.
+COPY_STREAM, COMPUTE_STREAM = None, None
+if device.type == 'cuda':
+    COPY_STREAM, COMPUTE_STREAM = torch.cuda.Stream(), torch.cuda.Stream()
+
+def run_batch(x):
+    """
+    Runs one forward pass over a stacked batch and returns the logits.
+    TensorRT serves every batch size its engine accepts; single-image batches
+    otherwise use the fixed-shape CUDA graph when available.
+    """
+    n = x.shape[0]
+    if n <= trt_max_batch:
+        # The buffers are sized for trt_max_batch: use their leading n rows
+        trt_context.set_input_shape(trt_input_name, tuple(x.shape))
+        trt_in[:n].copy_(x, non_blocking=True)
+        trt_context.execute_async_v3(torch.cuda.current_stream().cuda_stream)
+        return trt_out[:n]
+    if x.shape[0] == 1 and cuda_graph is not None:
+        # Copy pixels into the captured input buffer and replay the graph
+        static_in.copy_(x, non_blocking=True)
+        cuda_graph.replay()
+        return static_out
+    if int8_model is not None:
+        return int8_model(x)
+    x = x.to(device, dtype=MODEL_DTYPE, memory_format=torch.channels_last, non_blocking=True)
+    if device.type != 'cuda':
+        return model(x)
+    # Pad to the next power of two so only the warmed-up shapes ever run: the
+    # compiled model has one graph per bucket, and eager cuDNN one autotuned algorithm
+    bucket = 1 << (n - 1).bit_length()
+    if bucket > n:
+        x = torch.cat([x, x.new_zeros((bucket - n,) + x.shape[1:])])
+        x = x.contiguous(memory_format=torch.channels_last)
+    net = compiled_model if compiled_model is not None else model
+    return net(x)[:n]
+
+def collect_batch(block):
+    """
+    Drains up to MAX_BATCH jobs. With `block`, waits for the first job and then at
+    most MAX_WAIT_MS for stragglers. Without it (a batch is in flight and its
+    results may be ready), only takes what is already queued and never waits.
+    Jobs whose request already gave up (timed out) are dropped here.
+    """
+    try:
+        batch = [PENDING.get(block=block)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + MAX_WAIT_MS / 1000
+    while len(batch) < MAX_BATCH:
+        remaining = deadline - time.monotonic()
+        if block and remaining <= 0:
+            break
+        try:
+            batch.append(PENDING.get(timeout=remaining) if block else PENDING.get_nowait())
+        except queue.Empty:
+            break
+    # Marks the futures as running so they can no longer be cancelled under us
+    return [job for job in batch if job.future.set_running_or_notify_cancel()]
+
+def launch_batch(batch, buf):
+    """
+    Uploads a batch and queues its forward pass without waiting for the GPU.
+    Returns the (class index, confidence) rows and an event marking their completion
+    (None on CPU, where everything has already run).
+    """
+    # Jobs may hold CPU (PIL path) or GPU (nvJPEG path) pixels
+    with torch.cuda.stream(COPY_STREAM) if COPY_STREAM is not None else nullcontext():
+        x = torch.stack([upload_pixels(job.tensor, buf, slot) for slot, job in enumerate(batch)])
+    if COPY_STREAM is not None:
+        compute = torch.cuda.current_stream()
+        compute.wait_event(COPY_STREAM.record_event())
+        # x was allocated on COPY_STREAM: keep its memory alive until compute is done
+        x.record_stream(compute)
+
+    with torch.no_grad(): # Disable gradient calculation for performance
+        logits = run_batch(x).float() # FP32 avoids overflow in the exp below
+        # argmax(softmax) == argmax(logits): only the top-1 probability is
+        # needed, exp(top - logsumexp), without materializing all 300 probs
+        top, idx = logits.max(1)
+        confidence = (top - torch.logsumexp(logits, 1)).exp()
+        results = torch.stack([idx.float(), confidence], dim=1)
+
+    if RESULT_PINNED is None:
+        return results, None
+    host = RESULT_PINNED[buf, :len(batch)]
+    host.copy_(results, non_blocking=True)
+    return host, torch.cuda.current_stream().record_event()
+
+def finish_batch(batch, results, done):
+    """Waits for a launched batch and resolves each job's future."""
+    try:
+        if done is not None:
+            done.synchronize()
+        rows = results.tolist()
+    except Exception as e:
+        fail_batch(batch, e)
+        return
+    for job, (class_idx, score) in zip(batch, rows):
+        # Resolve jobs one by one so a single bad future cannot fail the rest
+        try:
+            job.future.set_result((int(class_idx), score))
+        except Exception as e:
+            print(f"⚠️ Could not deliver prediction: {e}")
+
+def fail_batch(batch, error):
+    for job in batch:
+        try:
+            job.future.set_exception(error)
+        except Exception as e:
+            print(f"⚠️ Could not deliver error: {e}")
+
+def batch_worker():
+    """
+    Consumer loop: launches each new batch before collecting the previous one's
+    results, so batch N+1 is uploaded while batch N is still running on the GPU.
+    On CPU the forward pass has already run by the time launch_batch returns, so
+    batches are resolved right away instead of waiting behind the next one.
+    """
+    inflight = None
+    buf = 0
+    with torch.cuda.stream(COMPUTE_STREAM) if COMPUTE_STREAM is not None else nullcontext():
+        prepare_fast_paths()
+        WORKER_READY.set()
+        while True:
+            # Only block for new work when nothing is waiting to be collected
+            batch = collect_batch(block=inflight is None)
+            launched = None
+            if batch:
+                try:
+                    launched = (batch,) + launch_batch(batch, buf)
+                    buf ^= 1
+                except Exception as e:
+                    fail_batch(batch, e)
+                if launched is not None and launched[2] is None:
+                    finish_batch(*launched)
+                    launched = None
+            if inflight is not None:
+                finish_batch(*inflight)
+            inflight = launched
+
+# 6. HTTP Layer
+# Image downloads dominate request latency, so they run on the event loop through
+# a pooled async client: many fetches can be in flight while the GPU batches.
+SESSION = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+    timeout=10,
+    follow_redirects=True,
+)
+
+# Two-tier prediction cache: by URL (skips the download too) and by content hash
+# (dedupes different URLs pointing to the same image). Only touched from the
+# event loop thread, so no locking is needed.
+URL_CACHE = LRUCache(maxsize=URL_CACHE_SIZE)
+CONTENT_CACHE = LRUCache(maxsize=CONTENT_CACHE_SIZE)
+
+def content_hash(img_bytes):
+    """Fast digest of the raw image bytes (BLAKE3 when installed, else BLAKE2b)."""
+    if blake3 is not None:
+        return blake3(img_bytes).digest()
+    return hashlib.blake2b(img_bytes, digest_size=32).digest()
+
+async def classify(img_bytes):
+    """
+    Predicts the landmark in raw image bytes, going through the content-hash cache.
+    Returns the response dict ({'class', 'confidence'}).
+    """
+    digest = content_hash(img_bytes)
+    result = CONTENT_CACHE.get(digest)
+    if result is not None:
+        return result
+
+    # Decoding/resizing is CPU work, keep it off the event loop
+    pixels = await asyncio.to_thread(preprocess, img_bytes)
+
+    # Hand the image to the batching thread and wait without blocking the loop
+    future = Future()
+    PENDING.put(Job(pixels, future))
+    class_idx, score = await asyncio.wait_for(asyncio.wrap_future(future), timeout=10)
+    
+    # Map index to human-readable landmark name
+    result = {
+        'class': LABELS[class_idx],
+        'confidence': score # Raw probability in [0, 1], formatted by the client
+    }
+    CONTENT_CACHE[digest] = result
+    return result
+
+@asynccontextmanager
+async def lifespan(app):
+    # Started per worker process (not at import) so it survives Gunicorn's fork
+    threading.Thread(target=batch_worker, daemon=True).start()
+    # Don't accept traffic until compilation/warmup is done, so no request
+    # times out waiting behind it
+    await asyncio.to_thread(WORKER_READY.wait)
+    yield
+    await SESSION.aclose()
+
+app = FastAPI(title="Landmark Recognition Service", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+@app.post('/predict')
+async def predict(request: Request):
     """
     Main API endpoint. Receives a JSON containing an image URL, 
     processes the image, and returns the predicted landmark name.
     """
-    if model is None: 
-        return jsonify({'error': 'AI Engine not initialized'}), 500
+    if model is None and int8_model is None: 
+        return ORJSONResponse({'error': 'AI Engine not initialized'}, status_code=500)
     
     try:
         # Validate input
-        data = request.json
+        data = await request.json()
         image_url = data.get('url')
         if not image_url: 
-            return jsonify({'error': 'No URL provided'}), 400
+            return ORJSONResponse({'error': 'No URL provided'}, status_code=400)
+
+        result = URL_CACHE.get(image_url)
+        if result is not None:
+            return ORJSONResponse(result)
 
         # Fetch image from the provided URL (e.g., from Cloudinary)
-        response = requests.get(image_url, timeout=10)
-        img = Image.open(BytesIO(response.content)).convert('RGB')
-        
-        # Apply preprocessing and add batch dimension (Batch size = 1)
-        img_tensor = transform(img).unsqueeze(0).to(device)
-
-        # Inference Block
-        with torch.no_grad(): # Disable gradient calculation for performance
-            output = model(img_tensor)
-            # Convert raw model outputs (logits) to probabilities
-            probs = torch.nn.functional.softmax(output, dim=1)
-            confidence, idx = torch.max(probs, 1)
-        
-        class_idx = idx.item()
-        score = confidence.item()
-        
-        # Map index to human-readable landmark name
-        label = CLASS_NAMES[class_idx] if class_idx < len(CLASS_NAMES) else f"Class {class_idx}"
-        
-        return jsonify({
-            'class': label,
-            'confidence': f"{score:.2%}" # Format as percentage string
-        })
+        response = await SESSION.get(image_url)
+        result = await classify(response.content)
+
+        URL_CACHE[image_url] = result
+        return ORJSONResponse(result)
         
     except Exception as e:
         print(f"🔥 Server Prediction Error: {e}")
-        return jsonify({'error': str(e)}), 500
+        return ORJSONResponse({'error': str(e)}, status_code=500)
+
+async def read_limited_body(request, limit):
+    """Reads the request body, or returns None as soon as it exceeds `limit` bytes."""
+    declared = request.headers.get('content-length')
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        return None
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+@app.post('/predict_raw')
+async def predict_raw(request: Request):
+    """
+    Same as /predict for clients that already hold the image: accepts the raw
+    bytes as the request body (e.g. Content-Type: image/jpeg), or a JSON body
+    with a base64-encoded 'image' field. Saves the server-side download.
+    """
+    if model is None and int8_model is None: 
+        return ORJSONResponse({'error': 'AI Engine not initialized'}, status_code=500)
+
+    try:
+        body = await read_limited_body(request, MAX_UPLOAD_BYTES)
+        if body is None:
+            return ORJSONResponse({'error': 'Image too large'}, status_code=413)
+
+        if request.headers.get('content-type', '').startswith('application/json'):
+            data = orjson.loads(body)
+            try:
+                img_bytes = base64.b64decode(data.get('image') or '', validate=True)
+            except binascii.Error:
+                return ORJSONResponse({'error': 'Invalid base64 image'}, status_code=400)
+        else:
+            img_bytes = body
+        if not img_bytes:
+            return ORJSONResponse({'error': 'No image provided'}, status_code=400)
+
+        return ORJSONResponse(await classify(img_bytes))
+
+    except Exception as e:
+        print(f"🔥 Server Prediction Error: {e}")
+        return ORJSONResponse({'error': str(e)}, status_code=500)
 
 if __name__ == '__main__':
-    # Running on internal port 5000. 
-    # Note: In production, use Gunicorn or uWSGI instead of app.run()
-    app.run(port=5000, debug=False)
\ No newline at end of file
+    # Development server on internal port 5000.
+    # In production run under Gunicorn instead: gunicorn -c gunicorn.conf.py app:app
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=5000)
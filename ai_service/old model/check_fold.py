@@ -0,0 +1,51 @@
+"""
+Sanity check for the normalization folded into the stem conv (fold_normalization).
+Runs the original model (PIL + Normalize preprocessing) and the folded model
+(raw pixels) side by side in FP32 on CPU and compares their top-1 predictions:
+
+    python check_fold.py "../../test images"
+"""
+
+import copy
+import os
+import sys
+
+import numpy as np
+import torch
+from PIL import Image
+
+from app import (
+    get_model, load_weights, fold_normalization, transform,
+    NUM_CLASSES, IMAGENET_MEAN, IMAGENET_STD,
+)
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python check_fold.py <image folder>")
+
+    reference = get_model(NUM_CLASSES)
+    reference.load_state_dict(load_weights())
+    reference.classifier = reference.classifier[1]
+    reference.eval()
+    folded = fold_normalization(copy.deepcopy(reference)).eval()
+
+    mean = torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1)
+    std = torch.tensor(IMAGENET_STD).view(1, 3, 1, 1)
+    mismatches, total, max_diff = 0, 0, 0.0
+    for name in sorted(os.listdir(sys.argv[1])):
+        try:
+            img = transform(Image.open(os.path.join(sys.argv[1], name)).convert('RGB'))
+        except Exception as e:
+            print(f"⚠️ Skipping {name}: {e}")
+            continue
+        pixels = torch.from_numpy(np.asarray(img, dtype=np.float32)).permute(2, 0, 1).unsqueeze(0)
+        with torch.no_grad():
+            expected = reference((pixels / 255 - mean) / std)
+            actual = folded(pixels)
+        total += 1
+        max_diff = max(max_diff, (expected - actual).abs().max().item())
+        if expected.argmax(1).item() != actual.argmax(1).item():
+            mismatches += 1
+            print(f"❌ Top-1 mismatch on {name}")
+
+    print(f"✅ {total - mismatches}/{total} top-1 predictions match (max logit diff {max_diff:.2e}).")
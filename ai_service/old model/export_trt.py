@@ -0,0 +1,37 @@
+"""
+Offline TensorRT export for the landmark classifier.
+Exports the trained EfficientNet_B3 to ONNX; the engine is then built with trtexec:
+
+    trtexec --onnx=b3.onnx --fp16 --saveEngine=b3.plan \
+        --minShapes=input:1x3x300x300 --optShapes=input:8x3x300x300 --maxShapes=input:32x3x300x300
+    (or --int8 --calib=<calibration cache> instead of --fp16)
+
+The batch axis is dynamic so one engine serves every batch the request batcher
+forms; --maxShapes should match MAX_BATCH in app.py.
+
+app.py picks up b3.plan automatically at startup when running on GPU.
+The exported graph takes raw 0-255 pixels (normalization is folded into the stem conv).
+"""
+
+import torch
+
+from app import model, device, INPUT_SHAPE, MODEL_DTYPE, ENGINE_INPUT
+
+ONNX_FILE = "b3.onnx"
+
+if __name__ == '__main__':
+    if model is None:
+        raise SystemExit("❌ Model not initialized, nothing to export.")
+
+    # Only the batch axis is dynamic; the 300x300 image size stays fixed
+    dummy = torch.randn(INPUT_SHAPE, device=device, dtype=MODEL_DTYPE)
+    torch.onnx.export(
+        model,
+        dummy,
+        ONNX_FILE,
+        opset_version=17,
+        input_names=[ENGINE_INPUT],
+        output_names=['logits'],
+        dynamic_axes={ENGINE_INPUT: {0: 'batch'}, 'logits': {0: 'batch'}},
+    )
+    print(f"✅ Exported {ONNX_FILE}. Build the engine with trtexec (see module docstring).")
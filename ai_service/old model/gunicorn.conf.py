@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for the Landmark Recognition Service.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+A single Uvicorn worker per GPU: its event loop handles request concurrency and
+every request funnels into that worker's batching thread. On multi-GPU boxes run
+one instance per GPU, e.g. CUDA_VISIBLE_DEVICES=1 BIND=127.0.0.1:5001.
+"""
+
+import os
+
+bind = os.environ.get("BIND", "127.0.0.1:5000")
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+# The worker only starts heartbeating once the app's lifespan startup is done,
+# and that waits for torch.compile to build and warm up every batch bucket (plus
+# the model load). A cold Inductor compile can take several minutes, so the
+# default is generous; lower it with GUNICORN_TIMEOUT once the compile cache is warm.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 900))
+
+# Preloading loads the weights once in the master and shares them copy-on-write
+# across workers. A CUDA context does not survive fork(), so only enable it on
+# CPU-only hosts (GUNICORN_PRELOAD=1 together with WEB_CONCURRENCY > 1).
+preload_app = os.environ.get("GUNICORN_PRELOAD", "0") == "1"
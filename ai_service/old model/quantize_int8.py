@@ -0,0 +1,56 @@
+"""
+Offline INT8 post-training quantization for CPU-only deployments.
+Calibrates the trained EfficientNet_B3 on a folder of sample images with FX graph
+mode quantization (FBGEMM/x86 kernels) and saves a TorchScript module:
+
+    python quantize_int8.py "../../test images"
+
+app.py loads b3_int8.pt automatically at startup when no GPU is available.
+"""
+
+import os
+import sys
+
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+from app import model, device, preprocess, INPUT_SHAPE, INT8_FILE
+
+CALIBRATION_LIMIT = 200 # Max images used to collect activation ranges
+
+def calibration_images(folder):
+    """Yields preprocessed (1, 3, 300, 300) float tensors for the images in `folder`."""
+    for name in sorted(os.listdir(folder))[:CALIBRATION_LIMIT]:
+        try:
+            with open(os.path.join(folder, name), 'rb') as f:
+                pixels = preprocess(f.read())
+        except Exception as e:
+            print(f"⚠️ Skipping {name}: {e}")
+            continue
+        yield pixels.unsqueeze(0).cpu().float()
+
+if __name__ == '__main__':
+    if model is None:
+        raise SystemExit("❌ Model not initialized, nothing to quantize.")
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python quantize_int8.py <calibration image folder>")
+    if device.type == 'cuda':
+        # The INT8 model only serves CPU hosts; on GPU app.py halves the weights
+        # and decodes JPEGs on the device, so calibrate on a CPU-only machine
+        raise SystemExit("❌ Run this on a CPU-only host (e.g. CUDA_VISIBLE_DEVICES='').")
+
+    torch.backends.quantized.engine = 'x86'
+    fp32_model = model.float().cpu().eval()
+    example_inputs = (torch.zeros(INPUT_SHAPE),)
+
+    prepared = prepare_fx(fp32_model, get_default_qconfig_mapping('x86'), example_inputs)
+    with torch.no_grad():
+        for x in calibration_images(sys.argv[1]):
+            prepared(x)
+    int8 = convert_fx(prepared)
+
+    with torch.no_grad():
+        scripted = torch.jit.trace(int8, example_inputs)
+    torch.jit.save(scripted, INT8_FILE)
+    print(f"✅ Saved INT8 model to {INT8_FILE}.")